@@ -31,25 +31,140 @@ import re
 import csv
 import os
 import json
+import io
 import argparse
+import pickle
+import hashlib
+from array import array
 from pathlib import Path
-from typing import List, Dict, Tuple, Optional
+from typing import List, Dict, Tuple, Optional, Sequence, Hashable
 from collections import Counter
 from itertools import combinations
+from functools import lru_cache
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from datetime import datetime
 import subprocess
+import shutil
+
+try:
+    # Implementación en C (bit-paralela) de Levenshtein; opcional
+    from rapidfuzz.distance import Levenshtein as _Lev
+except ImportError:
+    _Lev = None
+
+try:
+    # Serializador JSON en C; opcional
+    import orjson
+except ImportError:
+    orjson = None
 
 # ======================================
 # 🔹 Limpieza y tokenización del código
 # ======================================
 
 # Palabras clave importantes para preservar la semántica
-PYTHON_KEYWORDS = {
+PYTHON_KEYWORDS = frozenset({
     'def', 'class', 'if', 'else', 'elif', 'for', 'while', 'try', 'except', 
     'finally', 'with', 'import', 'from', 'return', 'yield', 'break', 
     'continue', 'pass', 'and', 'or', 'not', 'in', 'is', 'lambda'
+})
+
+JAVASCRIPT_KEYWORDS = frozenset({
+    'function', 'class', 'if', 'else', 'for', 'while', 'do', 'switch', 'case',
+    'default', 'try', 'catch', 'finally', 'throw', 'import', 'export', 'from',
+    'return', 'yield', 'await', 'async', 'break', 'continue', 'new', 'delete',
+    'typeof', 'instanceof', 'in', 'of', 'var', 'let', 'const'
+})
+
+JAVA_KEYWORDS = frozenset({
+    'class', 'interface', 'enum', 'extends', 'implements', 'if', 'else', 'for',
+    'while', 'do', 'switch', 'case', 'default', 'try', 'catch', 'finally',
+    'throw', 'throws', 'import', 'package', 'return', 'break', 'continue',
+    'new', 'instanceof', 'static', 'final', 'void'
+})
+
+C_KEYWORDS = frozenset({
+    'if', 'else', 'for', 'while', 'do', 'switch', 'case', 'default', 'return',
+    'break', 'continue', 'goto', 'struct', 'union', 'enum', 'typedef',
+    'sizeof', 'static', 'const', 'void'
+})
+
+CPP_KEYWORDS = C_KEYWORDS | frozenset({
+    'class', 'namespace', 'template', 'typename', 'try', 'catch', 'throw',
+    'new', 'delete', 'virtual', 'using'
+})
+
+CSHARP_KEYWORDS = frozenset({
+    'class', 'interface', 'struct', 'enum', 'namespace', 'using', 'if', 'else',
+    'for', 'foreach', 'while', 'do', 'switch', 'case', 'default', 'try',
+    'catch', 'finally', 'throw', 'return', 'yield', 'break', 'continue',
+    'new', 'is', 'as', 'in', 'static', 'void'
+})
+
+# Fragmentos de las expresiones regulares del escáner
+_PY_DOCSTRING = r'"""[\s\S]*?"""|' + r"'''[\s\S]*?'''"
+_PY_COMENTARIO = _PY_DOCSTRING + r'|#[^\n]*'
+# Un comentario de bloque sin cerrar llega hasta el final del archivo, como en
+# el compilador; exigir el cierre haría que cada '/*' posterior volviera a
+# recorrer el resto del texto (tiempo cuadrático).
+_C_COMENTARIO = r'/\*[\s\S]*?(?:\*/|\Z)|//[^\n]*'
+_CADENA = r'"[^"]*"|' + r"'[^']*'"
+_SIMBOLO = r'\d+|[=+\-*/<>:.,(){}[\];]'
+
+
+def _compilar_escaner(comentario: Optional[str], cadena: str):
+    """
+    Compila una única expresión que recorre el código en una sola pasada.
+    
+    El grupo 1 captura los tokens; los comentarios coinciden fuera del grupo
+    y se descartan. Los literales de cadena quedan unidos al identificador
+    adyacente (p. ej. ``f"..."``), igual que al reemplazarlos por texto.
+    """
+    palabra = r'(?:[A-Za-z_]|{0})(?:[A-Za-z0-9_]|{0})*'.format(cadena)
+    token = r'({0}|{1})'.format(palabra, _SIMBOLO)
+    if comentario:
+        return re.compile(comentario + '|' + token)
+    return re.compile(token)
+
+
+# Expresiones regulares compiladas una sola vez al cargar el módulo
+_RE_ESCANER_PY = _compilar_escaner(_PY_COMENTARIO, _PY_DOCSTRING + '|' + _CADENA)
+_RE_ESCANER_C = _compilar_escaner(_C_COMENTARIO, _CADENA)
+_RE_ESCANER_OTRO = _compilar_escaner(None, _CADENA)
+_RE_PY_DOCSTRING = re.compile(_PY_DOCSTRING)
+_RE_CADENA = re.compile(_CADENA)
+
+# Escáner y palabras clave de cada lenguaje; los no listados usan
+# _RE_ESCANER_OTRO y PYTHON_KEYWORDS
+_ESCANERES = {
+    'python': _RE_ESCANER_PY,
+    'javascript': _RE_ESCANER_C,
+    'java': _RE_ESCANER_C,
+    'cpp': _RE_ESCANER_C,
+    'c': _RE_ESCANER_C,
+    'csharp': _RE_ESCANER_C,
+}
+_PALABRAS_CLAVE = {
+    'python': PYTHON_KEYWORDS,
+    'javascript': JAVASCRIPT_KEYWORDS,
+    'java': JAVA_KEYWORDS,
+    'cpp': CPP_KEYWORDS,
+    'c': C_KEYWORDS,
+    'csharp': CSHARP_KEYWORDS,
 }
 
+# Potencias de dos para las máscaras de Myers; evitan crear 1 << i por cada
+# elemento. Ocupan 1,2 MB, así que solo se generan la primera vez que se usa el
+# algoritmo propio (no con rapidfuzz). Las secuencias más largas que el límite
+# (la mayoría de los archivos tienen menos tokens) calculan los desplazamientos.
+_LIMITE_POTENCIAS_DOS = 4096
+_POTENCIAS_DOS: Optional[List[int]] = None
+
+# Caché en disco de tokens, indexada por el hash del contenido de cada archivo
+# (ver directorio_cache). Cambiar la versión al modificar limpiar_codigo
+# invalida las entradas antiguas.
+_VERSION_CACHE = 3
+
 def detectar_lenguaje(nombre_archivo: str) -> str:
     """Detecta el lenguaje de programación basado en la extensión."""
     ext = Path(nombre_archivo).suffix.lower()
@@ -79,36 +194,38 @@ def limpiar_codigo(texto: str, lenguaje: str = 'python') -> List[str]:
         return []
     
     try:
-        # Limpiar según el lenguaje
-        if lenguaje == 'python':
-            # Eliminar docstrings y comentarios de Python
-            texto = re.sub(r'"""[\s\S]*?"""', '', texto)
-            texto = re.sub(r"'''[\s\S]*?'''", '', texto)
-            texto = re.sub(r'#.*', '', texto)
-        elif lenguaje in ['javascript', 'java', 'cpp', 'c', 'csharp']:
-            # Eliminar comentarios de C-style
-            texto = re.sub(r'/\*[\s\S]*?\*/', '', texto)
-            texto = re.sub(r'//.*', '', texto)
-        
-        # Eliminar strings literales pero preservar su presencia
-        texto = re.sub(r'"[^"]*"', 'STRING_LITERAL', texto)
-        texto = re.sub(r"'[^']*'", 'STRING_LITERAL', texto)
-        
-        # Normalizar espacios
-        texto = re.sub(r'\s+', ' ', texto.strip())
-        
-        # Tokenización mejorada
-        tokens = re.findall(r'[A-Za-z_][A-Za-z0-9_]*|\d+|[=+\-*/<>:.,(){}[\];]', texto)
-        
-        # Filtrar tokens vacíos y normalizar
+        # Seleccionar el escáner y las palabras clave según el lenguaje
+        escaner = _ESCANERES.get(lenguaje, _RE_ESCANER_OTRO)
+        palabras_clave = _PALABRAS_CLAVE.get(lenguaje, PYTHON_KEYWORDS)
+        
+        # Recorrer el código una sola vez descartando comentarios. Los tokens se
+        # repiten mucho: cada texto distinto se normaliza una sola vez
         tokens_limpios = []
-        for token in tokens:
-            if token and len(token.strip()) > 0:
-                # Preservar palabras clave importantes
-                if token.lower() in PYTHON_KEYWORDS:
-                    tokens_limpios.append(f"KEYWORD_{token.upper()}")
-                else:
-                    tokens_limpios.append(token.lower())
+        agregar = tokens_limpios.append
+        normalizados = {}
+        intern = sys.intern
+        for token in escaner.findall(texto):
+            normalizado = normalizados.get(token)
+            if normalizado is None:
+                normalizado = token
+                # Eliminar strings literales pero preservar su presencia
+                if '"' in normalizado or "'" in normalizado:
+                    if lenguaje == 'python':
+                        normalizado = _RE_PY_DOCSTRING.sub('', normalizado)
+                    normalizado = _RE_CADENA.sub('STRING_LITERAL', normalizado)
+                
+                if normalizado:
+                    # Preservar palabras clave importantes
+                    minuscula = normalizado.lower()
+                    if minuscula in palabras_clave:
+                        normalizado = intern("KEYWORD_" + normalizado.upper())
+                    else:
+                        # Internar: tokens iguales comparten un único objeto
+                        normalizado = intern(minuscula)
+                normalizados[token] = normalizado
+            
+            if normalizado:
+                agregar(normalizado)
         
         return tokens_limpios
         
@@ -117,6 +234,173 @@ def limpiar_codigo(texto: str, lenguaje: str = 'python') -> List[str]:
         return []
 
 
+def preparar_tokens(tokens: Sequence[Hashable]) -> Tuple[Counter, float]:
+    """
+    Precalcula las estructuras que usa similitudes_por_lotes().
+    
+    Al comparar N archivos cada uno participa en N-1 comparaciones; construir
+    aquí el vector de frecuencias y la norma L2 evita rehacer ese trabajo en
+    cada par. El número de tokens distintos (para Jaccard) es len(frecuencias).
+    
+    Args:
+        tokens: Lista de tokens de un código (o sus identificadores)
+    
+    Returns:
+        Tuple[Counter, float]: (frecuencias, norma L2)
+    """
+    frecuencias = Counter(tokens)
+    norma = math.sqrt(sum(v * v for v in frecuencias.values()))
+    return frecuencias, norma
+
+
+def codificar_tokens(tokens: List[str], vocabulario: Dict[str, int]) -> array:
+    """
+    Sustituye cada token por un identificador entero de 32 bits.
+    
+    Las métricas solo comparan tokens por igualdad, así que pueden trabajar
+    con enteros: se hashean y comparan más rápido que las cadenas y el arreglo
+    resultante ocupa 4 bytes por token al enviarlo a los procesos trabajadores.
+    Todos los archivos de una comparación deben compartir el vocabulario.
+    
+    Args:
+        tokens: Lista de tokens de un código
+        vocabulario: Diccionario token -> identificador; se amplía con los
+                     tokens nuevos
+    
+    Returns:
+        array: Identificadores de los tokens (tipo 'i')
+    """
+    asignar = vocabulario.setdefault
+    return array('i', [asignar(token, len(vocabulario)) for token in tokens])
+
+
+def leer_bytes(nombre_archivo: str) -> bytes:
+    """
+    Lee un archivo completo como bytes con llamadas directas al sistema.
+    
+    Con el tamaño que da fstat() basta normalmente una sola lectura, sin el
+    objeto de buffer ni la decodificación de open() en modo texto.
+    
+    Args:
+        nombre_archivo: Ruta del archivo
+    
+    Returns:
+        bytes: Contenido del archivo
+    """
+    fd = os.open(nombre_archivo, os.O_RDONLY | getattr(os, 'O_BINARY', 0))
+    try:
+        tamano = os.fstat(fd).st_size
+        # Pedir un byte de más detecta si el archivo creció desde fstat()
+        datos = os.read(fd, tamano + 1)
+        if len(datos) <= tamano:
+            return datos
+        bloques = [datos]
+        while True:
+            bloque = os.read(fd, 1 << 16)
+            if not bloque:
+                return b''.join(bloques)
+            bloques.append(bloque)
+    finally:
+        os.close(fd)
+
+
+def leer_archivos(nombres: Sequence[str]) -> Dict[str, object]:
+    """
+    Lee el contenido binario de varios archivos en paralelo.
+    
+    La lectura libera el GIL, así que un pool de hilos solapa la latencia de
+    disco (notable en almacenamiento de red); la tokenización sigue en el
+    hilo principal.
+    
+    Args:
+        nombres: Rutas de los archivos a leer
+    
+    Returns:
+        Diccionario ruta -> bytes leídos, o la excepción OSError si falló
+    """
+    def leer(nombre):
+        try:
+            return leer_bytes(nombre)
+        except OSError as e:
+            return e
+    
+    if len(nombres) < 2:
+        return {nombre: leer(nombre) for nombre in nombres}
+    with ThreadPoolExecutor(max_workers=min(32, len(nombres))) as ejecutor:
+        return dict(zip(nombres, ejecutor.map(leer, nombres)))
+
+
+@lru_cache(maxsize=None)
+def directorio_cache() -> Optional[Path]:
+    """
+    Directorio de la caché de tokens: $XDG_CACHE_HOME/simcod o ~/.cache/simcod.
+    
+    Se resuelve al usarse y no al importar el módulo: sin HOME ni entrada en
+    passwd (contenedores con un UID arbitrario) Path.home() falla, y entonces
+    la caché simplemente queda desactivada.
+    
+    Returns:
+        Optional[Path]: Directorio de la caché, o None si no se puede determinar
+    """
+    base = os.environ.get('XDG_CACHE_HOME')
+    if not base:
+        try:
+            base = Path.home() / '.cache'
+        except (RuntimeError, KeyError, OSError):
+            return None
+    return Path(base) / 'simcod'
+
+
+def tokenizar_archivo(nombre_archivo: str, lenguaje: str, usar_cache: bool = True,
+                      datos: Optional[bytes] = None) -> List[str]:
+    """
+    Lee y tokeniza un archivo reutilizando la caché en disco si es posible.
+    
+    Los archivos rara vez cambian entre ejecuciones, así que los tokens se
+    guardan en directorio_cache() con el hash BLAKE2 del contenido (más el
+    lenguaje y la versión de la caché) como clave. Una entrada ilegible o un
+    directorio sin permisos de escritura simplemente hacen que se tokenice.
+    
+    Args:
+        nombre_archivo: Ruta del archivo
+        lenguaje: Lenguaje de programación del archivo
+        usar_cache: Si leer y escribir la caché en disco
+        datos: Contenido ya leído del archivo (None: leerlo aquí)
+    
+    Returns:
+        Lista de tokens normalizados
+    """
+    if datos is None:
+        datos = leer_bytes(nombre_archivo)
+    
+    archivo_cache = None
+    directorio = directorio_cache() if usar_cache else None
+    if directorio is not None:
+        clave = hashlib.blake2b(datos, digest_size=16)
+        clave.update(f"\0{lenguaje}\0{_VERSION_CACHE}".encode())
+        archivo_cache = directorio / f"{clave.hexdigest()}.pkl"
+        try:
+            with open(archivo_cache, 'rb') as f:
+                return [sys.intern(t) for t in pickle.load(f)]
+        except (OSError, EOFError, ValueError, TypeError, pickle.PickleError):
+            pass
+    
+    tokens = limpiar_codigo(datos.decode('utf-8'), lenguaje)
+    
+    if archivo_cache is not None and tokens:
+        try:
+            directorio.mkdir(parents=True, exist_ok=True)
+            # Escribir aparte y renombrar: nunca queda una entrada a medias
+            temporal = archivo_cache.with_suffix(f".{os.getpid()}.tmp")
+            with open(temporal, 'wb') as f:
+                pickle.dump(tokens, f, pickle.HIGHEST_PROTOCOL)
+            os.replace(temporal, archivo_cache)
+        except OSError:
+            pass
+    
+    return tokens
+
+
 # ======================================
 # 🔹 Índice 1: Cosine Similarity
 # ======================================
@@ -144,20 +428,37 @@ def similitud_coseno(tokens1: List[str], tokens2: List[str]) -> float:
     if not tokens1 or not tokens2:
         return 0.0
     
+    if tokens1 is tokens2 or tokens1 == tokens2:
+        return 1.0
+    
     c1, c2 = Counter(tokens1), Counter(tokens2)
-    inter = set(c1.keys()) & set(c2.keys())
+    num = _producto_punto(c1, c2)
     
-    if not inter:
+    if not num:
         return 0.0
     
-    num = sum(c1[x] * c2[x] for x in inter)
-    den1 = math.sqrt(sum(v**2 for v in c1.values()))
-    den2 = math.sqrt(sum(v**2 for v in c2.values()))
-    den = den1 * den2
+    # Una sola raíz sobre el producto de las normas al cuadrado
+    den = math.sqrt(sum(v * v for v in c1.values()) * sum(v * v for v in c2.values()))
     
     return num / den if den else 0.0
 
 
+def _producto_punto(c1: Counter, c2: Counter) -> int:
+    """Producto punto de dos vectores de frecuencia de tokens."""
+    # Recorrer el vocabulario más pequeño y consultar el más grande
+    if len(c1) > len(c2):
+        c1, c2 = c2, c1
+    
+    obtener = c2.get
+    num = 0
+    for token, frecuencia in c1.items():
+        otra = obtener(token)
+        if otra:
+            num += frecuencia * otra
+    
+    return num
+
+
 # ======================================
 # 🔹 Índice 2: Jaccard Similarity
 # ======================================
@@ -185,22 +486,94 @@ def similitud_jaccard(tokens1: List[str], tokens2: List[str]) -> float:
     if not tokens1 or not tokens2:
         return 0.0
     
+    if tokens1 is tokens2 or tokens1 == tokens2:
+        return 1.0
+    
     set1, set2 = set(tokens1), set(tokens2)
     inter = len(set1 & set2)
-    union = len(set1 | set2)
+    # |A ∪ B| = |A| + |B| - |A ∩ B|, sin construir el conjunto unión
+    union = len(set1) + len(set2) - inter
     
     return inter / union if union else 0.0
 
 
+def similitudes_por_lotes(preparados: Sequence[Tuple]) -> Tuple[List[List[float]], ...]:
+    """
+    Calcula coseno y Jaccard de todos los pares de códigos en una sola pasada.
+    
+    Equivale a multiplicar la matriz dispersa documentos × tokens por su
+    traspuesta: un índice invertido token -> [(documento, frecuencia)] permite
+    acumular los productos punto y el tamaño de las intersecciones recorriendo
+    solo los tokens que cada par comparte, en lugar de buscar en los vectores
+    de frecuencia de cada par por separado.
+    
+    En la misma pasada se obtiene una cota superior exacta del ratio de
+    Levenshtein: una alineación solo puede conservar sin editar tantos tokens
+    como hay en común contando repeticiones, así que la distancia es al menos
+    max(len_a, len_b) - comunes. Sirve para descartar pares sin calcularla.
+    
+    Args:
+        preparados: Estructuras de preparar_tokens() de cada código
+    
+    Returns:
+        Tuple: (coseno, jaccard, cota_levenshtein), matrices donde la
+        posición [i][j] con i < j corresponde a los códigos i y j
+    """
+    n = len(preparados)
+    indice = {}
+    for documento, (frecuencias, _) in enumerate(preparados):
+        for token, cantidad in frecuencias.items():
+            indice.setdefault(token, []).append((documento, cantidad))
+    
+    productos = [[0] * n for _ in range(n)]
+    intersecciones = [[0] * n for _ in range(n)]
+    comunes = [[0] * n for _ in range(n)]
+    for apariciones in indice.values():
+        for k, (i, cantidad_i) in enumerate(apariciones):
+            fila_productos = productos[i]
+            fila_intersecciones = intersecciones[i]
+            fila_comunes = comunes[i]
+            for j, cantidad_j in apariciones[k + 1:]:
+                fila_productos[j] += cantidad_i * cantidad_j
+                fila_intersecciones[j] += 1
+                fila_comunes[j] += cantidad_i if cantidad_i < cantidad_j else cantidad_j
+    
+    longitudes = [sum(frecuencias.values()) for frecuencias, _ in preparados]
+    coseno = [[0.0] * n for _ in range(n)]
+    jaccard = [[0.0] * n for _ in range(n)]
+    cota_levenshtein = [[0.0] * n for _ in range(n)]
+    for i in range(n):
+        frecuencias_i, norma_i = preparados[i]
+        for j in range(i + 1, n):
+            frecuencias_j, norma_j = preparados[j]
+            den = norma_i * norma_j
+            if den:
+                coseno[i][j] = productos[i][j] / den
+            union = len(frecuencias_i) + len(frecuencias_j) - intersecciones[i][j]
+            if union:
+                jaccard[i][j] = intersecciones[i][j] / union
+            max_len = max(longitudes[i], longitudes[j])
+            if max_len:
+                # Misma forma que ratio_levenshtein(): la cota nunca queda por
+                # debajo del ratio real por redondeo
+                cota_levenshtein[i][j] = 1.0 - (max_len - comunes[i][j]) / max_len
+    
+    return coseno, jaccard, cota_levenshtein
+
+
 # ======================================
 # 🔹 Índice 3: Levenshtein Ratio (Optimizado)
 # ======================================
-def distancia_levenshtein(a: str, b: str) -> int:
+def distancia_levenshtein(a: Sequence[Hashable], b: Sequence[Hashable], max_k: Optional[int] = None) -> int:
     """
-    Calcula la distancia de edición (Levenshtein) entre dos cadenas.
+    Calcula la distancia de edición (Levenshtein) entre dos secuencias
+    (cadenas de texto, listas de tokens o sus identificadores).
     
-    Implementación optimizada que usa solo O(min(len(a), len(b))) memoria
-    en lugar de O(len(a) * len(b)).
+    Si la librería ``rapidfuzz`` está instalada se delega el cálculo a su
+    implementación en C; en caso contrario se usa el algoritmo bit-paralelo de
+    Myers (1999), que procesa una columna completa de la matriz de programación
+    dinámica por iteración usando operaciones sobre enteros de Python como
+    vectores de bits (O(len(b)) iteraciones en lugar de O(len(a) * len(b))).
     
     Algoritmo propuesto por Vladimir Levenshtein (1966) para corrección de errores
     en códigos binarios, con optimización de Wagner & Fischer (1974).
@@ -211,58 +584,155 @@ def distancia_levenshtein(a: str, b: str) -> int:
         
         Wagner, R. A., & Fischer, M. J. (1974). The string-to-string correction 
         problem. Journal of the ACM, 21(1), 168-173.
+        
+        Myers, G. (1999). A fast bit-vector algorithm for approximate string
+        matching based on dynamic programming. Journal of the ACM, 46(3), 395-415.
+        
+        Hyyrö, H. (2001). Explaining and extending the bit-parallel approximate
+        string matching algorithm of Myers. Technical Report A-2001-10,
+        University of Tampere.
     
     Args:
-        a: Primera cadena
-        b: Segunda cadena
+        a: Primera secuencia
+        b: Segunda secuencia
+        max_k: Cota superior opcional. Si la distancia la supera se devuelve
+               max_k + 1 sin completar el cálculo.
     
     Returns:
         int: Número mínimo de operaciones (inserción, eliminación, sustitución)
              necesarias para transformar 'a' en 'b'
     """
-    if len(a) < len(b):
-        return distancia_levenshtein(b, a)
-    
-    if len(b) == 0:
-        return len(a)
+    global _POTENCIAS_DOS
     
-    # Usar solo dos filas para optimizar memoria
-    prev_row = list(range(len(b) + 1))
+    if _Lev is not None:
+        return _Lev.distance(a, b, score_cutoff=max_k)
     
-    for i, ca in enumerate(a):
-        curr_row = [i + 1]
-        for j, cb in enumerate(b):
-            # Costo de inserción, eliminación y sustitución
-            insert_cost = prev_row[j + 1] + 1
-            delete_cost = curr_row[j] + 1  
-            substitute_cost = prev_row[j] + (0 if ca == cb else 1)
-            
-            curr_row.append(min(insert_cost, delete_cost, substitute_cost))
+    # La secuencia más larga ocupa los bits; la más corta se recorre
+    if len(a) < len(b):
+        a, b = b, a
+    
+    # Las ediciones óptimas nunca tocan un prefijo o sufijo común
+    prefijo = _longitud_prefijo_comun(a, b)
+    if prefijo:
+        a, b = a[prefijo:], b[prefijo:]
+    sufijo = _longitud_prefijo_comun(a[::-1], b[::-1])
+    if sufijo:
+        a, b = a[:len(a) - sufijo], b[:len(b) - sufijo]
+    m, n = len(a), len(b)
+    
+    # La distancia nunca supera len(a) ni es menor que len(a) - len(b)
+    cota = m if max_k is None else max_k
+    if m - n > cota:
+        return cota + 1
+    
+    if n == 0:
+        return m
+    
+    # Máscara de coincidencias: bit i activo si a[i] == c
+    potencias = _POTENCIAS_DOS
+    if potencias is None:
+        # Se construye aparte y se publica con una sola asignación: otro hilo
+        # nunca ve la tabla a medio llenar
+        potencias = _POTENCIAS_DOS = [1 << i for i in range(_LIMITE_POTENCIAS_DOS)]
+    bits = potencias if m <= _LIMITE_POTENCIAS_DOS else (1 << i for i in range(m))
+    peq = {}
+    obtener = peq.get
+    for ca, bit in zip(a, bits):
+        peq[ca] = obtener(ca, 0) | bit
+    
+    mascara = (1 << m) - 1
+    bit_alto = 1 << (m - 1)
+    
+    # Vectores de diferencias verticales positivas (pv) y negativas (mv)
+    pv = mascara
+    mv = 0
+    distancia = m
+    
+    # Cada columna restante puede reducir la distancia final en 1 como máximo
+    margen = cota + n
+    
+    for cb in b:
+        eq = peq.get(cb, 0)
+        xv = eq | mv
+        xh = (((eq & pv) + pv) ^ pv) | eq
+        ph = mv | (~(xh | pv) & mascara)
+        mh = pv & xh
+        
+        if ph & bit_alto:
+            distancia += 1
+        elif mh & bit_alto:
+            distancia -= 1
         
-        prev_row = curr_row
+        # La primera fila de la matriz crece en 1 por columna: entra un bit positivo
+        ph = ((ph << 1) | 1) & mascara
+        mh = (mh << 1) & mascara
+        pv = mh | (~(xv | ph) & mascara)
+        mv = ph & xv
+        
+        # Fuera de la banda de Ukkonen: ya no puede quedar por debajo de la cota
+        margen -= 1
+        if distancia > margen:
+            return cota + 1
     
-    return prev_row[-1]
+    return distancia
 
 
-def ratio_levenshtein(texto1: str, texto2: str) -> float:
+def _longitud_prefijo_comun(a, b) -> int:
+    """Longitud del prefijo común más largo de dos secuencias."""
+    # Búsqueda binaria: cada comparación de cortes se hace en C
+    bajo, alto = 0, min(len(a), len(b))
+    while bajo < alto:
+        medio = (bajo + alto + 1) // 2
+        if a[:medio] == b[:medio]:
+            bajo = medio
+        else:
+            alto = medio - 1
+    return bajo
+
+
+def ratio_levenshtein(tokens1: Sequence[Hashable], tokens2: Sequence[Hashable], min_ratio: float = 0.0) -> float:
     """
     Convierte la distancia de Levenshtein en un índice de similitud normalizado.
     
+    Se aplica sobre secuencias de tokens: la distancia cuenta tokens
+    insertados, eliminados o sustituidos, lo que es más significativo para
+    detectar clones que la distancia por caracteres y reduce el tamaño del
+    problema varias veces. También acepta cadenas de texto o identificadores
+    de tokens (ver codificar_tokens).
+    
     Args:
-        texto1: Primera cadena de texto
-        texto2: Segunda cadena de texto
+        tokens1: Tokens del primer código
+        tokens2: Tokens del segundo código
+        min_ratio: Similitud mínima de interés. Si la similitud real es menor
+                   se puede devolver 0.0 sin completar el cálculo.
     
     Returns:
         float: Similitud entre 0.0 (completamente diferentes) y 1.0 (idénticos)
     """
-    if not texto1 and not texto2:
+    if not tokens1 and not tokens2:
         return 1.0
     
-    if not texto1 or not texto2:
+    if not tokens1 or not tokens2:
         return 0.0
     
-    dist = distancia_levenshtein(texto1, texto2)
-    max_len = max(len(texto1), len(texto2))
+    if tokens1 is tokens2 or tokens1 == tokens2:
+        return 1.0
+    
+    max_len = max(len(tokens1), len(tokens2))
+    max_k = None
+    
+    if min_ratio > 0.0:
+        # La distancia es al menos la diferencia de longitudes
+        if 1.0 - abs(len(tokens1) - len(tokens2)) / max_len < min_ratio:
+            return 0.0
+        
+        # Solo interesan distancias hasta (1 - min_ratio) * max_len;
+        # el +1 absorbe el redondeo de coma flotante
+        max_k = int((1.0 - min_ratio) * max_len) + 1
+    
+    dist = distancia_levenshtein(tokens1, tokens2, max_k)
+    if max_k is not None and dist > max_k:
+        return 0.0
     
     return 1.0 - (dist / max_len) if max_len > 0 else 0.0
 
@@ -273,7 +743,10 @@ def ratio_levenshtein(texto1: str, texto2: str) -> float:
 
 def validar_archivo(nombre_archivo: str) -> Tuple[bool, str]:
     """
-    Valida si un archivo existe, es legible y contiene código.
+    Valida si un archivo existe, tiene una extensión soportada y no está vacío.
+    
+    No lee el contenido: el archivo se lee una sola vez al tokenizarlo, donde
+    se informan los errores de lectura o de codificación.
     
     Args:
         nombre_archivo: Ruta del archivo a validar
@@ -293,11 +766,8 @@ def validar_archivo(nombre_archivo: str) -> Tuple[bool, str]:
         if Path(nombre_archivo).suffix.lower() not in extensiones_validas:
             return False, f"Extensión no soportada: {nombre_archivo}"
         
-        # Intentar leer el archivo
-        with open(nombre_archivo, 'r', encoding='utf-8') as f:
-            contenido = f.read()
-            if not contenido.strip():
-                return False, f"Archivo vacío: {nombre_archivo}"
+        if os.path.getsize(nombre_archivo) == 0:
+            return False, f"Archivo vacío: {nombre_archivo}"
         
         return True, "OK"
         
@@ -347,40 +817,40 @@ def generar_matriz_similitud(f, resultados: List[List], archivos_procesados: Lis
         archivos_procesados: Lista de archivos procesados
         metrica: Métrica a mostrar ('coseno', 'jaccard', 'levenshtein')
     """
-    # Crear diccionario de similitudes para acceso rápido
-    sim_dict = {}
     metrica_idx = {'coseno': 2, 'jaccard': 3, 'levenshtein': 4}
     idx = metrica_idx.get(metrica, 2)
     
+    # Matriz densa indexada por la posición de cada archivo (simétrica)
+    n = len(archivos_procesados)
+    posiciones = {archivo: i for i, archivo in enumerate(archivos_procesados)}
+    matriz = [[0.0] * n for _ in range(n)]
     for resultado in resultados:
-        key = (resultado[0], resultado[1])
-        sim_dict[key] = resultado[idx]
-        # Agregar la versión simétrica
-        key_inv = (resultado[1], resultado[0])
-        sim_dict[key_inv] = resultado[idx]
+        i, j = posiciones.get(resultado[0]), posiciones.get(resultado[1])
+        # Los pares con archivos fuera de la matriz no tienen celda
+        if i is not None and j is not None:
+            matriz[i][j] = matriz[j][i] = resultado[idx]
     
     # Generar encabezados
     nombres_archivos = [Path(archivo).name for archivo in archivos_procesados]
     f.write("| | " + " | ".join([f"`{nombre}`" for nombre in nombres_archivos]) + " |\n")
-    f.write("|" + "-|" * (len(archivos_procesados) + 1) + "\n")
-    
-    # Generar filas de la matriz
-    for i, archivo_a in enumerate(archivos_procesados):
-        nombre_a = Path(archivo_a).name
-        f.write(f"| `{nombre_a}` |")
-        
-        for j, archivo_b in enumerate(archivos_procesados):
-            if i == j:
-                f.write(" **1.000** |")
-            elif i < j:
-                # Buscar similitud
-                key = (archivo_a, archivo_b)
-                sim = sim_dict.get(key, 0.0)
-                color = get_color_similarity(sim)
-                f.write(f" {color}{sim:.3f}** |")
-            else:
-                f.write(" - |")
-        f.write("\n")
+    f.write("|" + "-|" * (n + 1) + "\n")
+    
+    # Las similitudes vienen redondeadas, así que se repiten mucho en matrices
+    # grandes: cada celda distinta se formatea una sola vez
+    celdas_formateadas = {}
+    
+    # Generar filas de la matriz: una sola escritura por fila
+    for i, nombre_a in enumerate(nombres_archivos):
+        celdas = [f"| `{nombre_a}` |"]
+        celdas.extend([" - |"] * i)
+        celdas.append(" **1.000** |")
+        for sim in matriz[i][i + 1:]:
+            celda = celdas_formateadas.get(sim)
+            if celda is None:
+                celda = celdas_formateadas[sim] = f" {get_color_similarity(sim)}{sim:.3f}** |"
+            celdas.append(celda)
+        celdas.append("\n")
+        f.write("".join(celdas))
 
 
 def get_color_similarity(similitud: float) -> str:
@@ -396,7 +866,9 @@ def get_color_similarity(similitud: float) -> str:
 
 
 def generar_reporte_markdown(resultados: List[List], estadisticas: Dict, 
-                           archivo_salida: str, archivos_procesados: List[str]) -> None:
+                           archivo_salida: str, archivos_procesados: List[str],
+                           contenido: Optional[str] = None,
+                           fecha: Optional[datetime] = None) -> None:
     """
     Genera un reporte en formato Markdown con tablas y estadísticas.
     
@@ -405,211 +877,251 @@ def generar_reporte_markdown(resultados: List[List], estadisticas: Dict,
         estadisticas: Diccionario con estadísticas resumen
         archivo_salida: Nombre base del archivo de salida
         archivos_procesados: Lista de archivos que fueron procesados
+        contenido: Reporte ya generado con renderizar_markdown(), para no
+                   volver a construirlo
+        fecha: Fecha de generación del reporte (por defecto, la actual)
     """
-    fecha_actual = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    
-    with open(f'{archivo_salida}.md', 'w', encoding='utf-8') as f:
-        # Header del reporte
-        f.write("# 🔍 Reporte de Similitud de Códigos Fuente\n\n")
-        f.write("**Análisis Computacional de Similitud entre Códigos Fuente**\n")
-        f.write("*Basado en Métricas Validadas Científicamente*\n\n")
-        f.write("---\n\n")
-        f.write("## 📋 Información del Análisis\n\n")
-        f.write(f"- **Fecha de generación:** {fecha_actual}\n")
-        f.write(f"- **Versión del software:** 2.0\n")
-        f.write(f"- **Archivos analizados:** {len(archivos_procesados)}\n")
-        f.write(f"- **Total de comparaciones:** {len(resultados)}\n")
-        f.write(f"- **Métricas utilizadas:** Coseno, Jaccard, Levenshtein\n")
-        f.write(f"- **Algoritmos implementados:** Salton et al. (1975), Jaccard (1912), Levenshtein (1966)\n\n")
-        
-        # Resumen ejecutivo
-        if estadisticas:
-            f.write("## 📊 Resumen Ejecutivo\n\n")
-            
-            # Determinar el nivel general de similitud
-            promedio_general = (estadisticas['cosine_promedio'] + 
-                              estadisticas['jaccard_promedio'] + 
-                              estadisticas['levenshtein_promedio']) / 3
-            
-            if promedio_general >= 0.7:
-                nivel_similitud = "**ALTA**"
-                interpretacion = "Se detectaron similitudes significativas que requieren atención."
-            elif promedio_general >= 0.4:
-                nivel_similitud = "**MEDIA**"
-                interpretacion = "Se observan similitudes moderadas entre algunos archivos."
-            else:
-                nivel_similitud = "**BAJA**"
-                interpretacion = "Los archivos muestran diferencias considerables en su estructura."
-            
-            f.write(f"- **Nivel de similitud general:** {nivel_similitud} ({promedio_general:.3f})\n")
-            f.write(f"- **Interpretación:** {interpretacion}\n")
-            f.write(f"- **Métrica más discriminante:** ")
-            
-            # Encontrar la métrica con mayor variabilidad
-            variabilidad_coseno = estadisticas['cosine_max'] - estadisticas['cosine_min']
-            variabilidad_jaccard = estadisticas['jaccard_max'] - estadisticas['jaccard_min']  
-            variabilidad_levenshtein = estadisticas['levenshtein_max'] - estadisticas['levenshtein_min']
-            
-            max_variabilidad = max(variabilidad_coseno, variabilidad_jaccard, variabilidad_levenshtein)
-            if max_variabilidad == variabilidad_coseno:
-                f.write("Similitud del Coseno\n")
-            elif max_variabilidad == variabilidad_jaccard:
-                f.write("Índice de Jaccard\n")
-            else:
-                f.write("Distancia de Levenshtein\n")
-            
-            f.write(f"- **Archivos con mayor similitud:** ")
-            # Encontrar el par con mayor similitud
-            max_similitud = 0
-            par_similar = None
-            for resultado in resultados:
-                sim_max = max(resultado[2], resultado[3], resultado[4])
-                if sim_max > max_similitud:
-                    max_similitud = sim_max
-                    par_similar = (Path(resultado[0]).name, Path(resultado[1]).name)
-            
-            if par_similar:
-                f.write(f"`{par_similar[0]}` y `{par_similar[1]}` ({max_similitud:.3f})\n")
-            
-            f.write("\n")
+    if contenido is None:
+        contenido = renderizar_markdown(resultados, estadisticas, archivos_procesados, fecha)
+    
+    with open(f'{archivo_salida}.md', 'w', encoding='utf-8') as salida:
+        salida.write(contenido)
+
+
+def renderizar_markdown(resultados: List[List], estadisticas: Dict,
+                        archivos_procesados: List[str],
+                        fecha: Optional[datetime] = None) -> str:
+    """
+    Construye en memoria el texto del reporte Markdown.
+    
+    Args:
+        resultados: Lista de resultados de comparación
+        estadisticas: Diccionario con estadísticas resumen
+        archivos_procesados: Lista de archivos que fueron procesados
+        fecha: Fecha de generación del reporte (por defecto, la actual)
+    
+    Returns:
+        str: Contenido completo del reporte
+    """
+    fecha_actual = (fecha or datetime.now()).strftime("%Y-%m-%d %H:%M:%S")
+    
+    # Nombre visible de cada archivo, calculado una sola vez; incluye los de
+    # 'resultados', que pueden no figurar en archivos_procesados
+    archivos = set(archivos_procesados)
+    for resultado in resultados:
+        archivos.update(resultado[:2])
+    nombres = {archivo: Path(archivo).name for archivo in archivos}
+    
+    # Similitud máxima de cada par entre las tres métricas, calculada una vez
+    maximos = [max(r[2], r[3], r[4]) for r in resultados]
+    
+    f = io.StringIO()
+    
+    # Header del reporte
+    f.write("# 🔍 Reporte de Similitud de Códigos Fuente\n\n")
+    f.write("**Análisis Computacional de Similitud entre Códigos Fuente**\n")
+    f.write("*Basado en Métricas Validadas Científicamente*\n\n")
+    f.write("---\n\n")
+    f.write("## 📋 Información del Análisis\n\n")
+    f.write(f"- **Fecha de generación:** {fecha_actual}\n")
+    f.write(f"- **Versión del software:** 2.0\n")
+    f.write(f"- **Archivos analizados:** {len(archivos_procesados)}\n")
+    f.write(f"- **Total de comparaciones:** {len(resultados)}\n")
+    f.write(f"- **Métricas utilizadas:** Coseno, Jaccard, Levenshtein\n")
+    f.write(f"- **Algoritmos implementados:** Salton et al. (1975), Jaccard (1912), Levenshtein (1966)\n\n")
+    
+    # Resumen ejecutivo
+    if estadisticas:
+        f.write("## 📊 Resumen Ejecutivo\n\n")
         
-        # Lista de archivos procesados
-        f.write("## 📁 Archivos Analizados\n\n")
-        for i, archivo in enumerate(archivos_procesados, 1):
-            nombre_archivo = Path(archivo).name
-            f.write(f"{i}. `{nombre_archivo}`\n")
-        f.write("\n")
+        # Determinar el nivel general de similitud
+        promedio_general = (estadisticas['cosine_promedio'] + 
+                          estadisticas['jaccard_promedio'] + 
+                          estadisticas['levenshtein_promedio']) / 3
         
-        # Tabla de resultados
-        f.write("## 📊 Resultados de Similitud\n\n")
+        if promedio_general >= 0.7:
+            nivel_similitud = "**ALTA**"
+            interpretacion = "Se detectaron similitudes significativas que requieren atención."
+        elif promedio_general >= 0.4:
+            nivel_similitud = "**MEDIA**"
+            interpretacion = "Se observan similitudes moderadas entre algunos archivos."
+        else:
+            nivel_similitud = "**BAJA**"
+            interpretacion = "Los archivos muestran diferencias considerables en su estructura."
         
-        # Si hay más de 3 archivos, mostrar matriz de similitud
-        if len(archivos_procesados) > 3:
-            f.write("### Matriz de Similitud (Coseno)\n\n")
-            generar_matriz_similitud(f, resultados, archivos_procesados, 'coseno')
-            f.write("\n")
+        f.write(f"- **Nivel de similitud general:** {nivel_similitud} ({promedio_general:.3f})\n")
+        f.write(f"- **Interpretación:** {interpretacion}\n")
+        f.write(f"- **Métrica más discriminante:** ")
+        
+        # Encontrar la métrica con mayor variabilidad
+        variabilidad_coseno = estadisticas['cosine_max'] - estadisticas['cosine_min']
+        variabilidad_jaccard = estadisticas['jaccard_max'] - estadisticas['jaccard_min']  
+        variabilidad_levenshtein = estadisticas['levenshtein_max'] - estadisticas['levenshtein_min']
+        
+        max_variabilidad = max(variabilidad_coseno, variabilidad_jaccard, variabilidad_levenshtein)
+        if max_variabilidad == variabilidad_coseno:
+            f.write("Similitud del Coseno\n")
+        elif max_variabilidad == variabilidad_jaccard:
+            f.write("Índice de Jaccard\n")
+        else:
+            f.write("Distancia de Levenshtein\n")
         
-        # Tabla detallada de comparaciones
-        f.write("### Comparaciones Detalladas\n\n")
-        f.write("| Archivo A | Archivo B | Coseno | Jaccard | Levenshtein |\n")
-        f.write("|-----------|-----------|--------|---------|-------------|\n")
+        f.write(f"- **Archivos con mayor similitud:** ")
+        # Encontrar el par con mayor similitud (el primero en caso de empate)
+        k = max(range(len(maximos)), key=maximos.__getitem__, default=None)
         
-        for resultado in resultados:
-            archivo_a = Path(resultado[0]).name
-            archivo_b = Path(resultado[1]).name
-            f.write(f"| `{archivo_a}` | `{archivo_b}` | {resultado[2]:.3f} | {resultado[3]:.3f} | {resultado[4]:.3f} |\n")
+        if k is not None and maximos[k] > 0:
+            par_similar = (nombres[resultados[k][0]], nombres[resultados[k][1]])
+            f.write(f"`{par_similar[0]}` y `{par_similar[1]}` ({maximos[k]:.3f})\n")
         
         f.write("\n")
+    
+    # Lista de archivos procesados
+    f.write("## 📁 Archivos Analizados\n\n")
+    for i, archivo in enumerate(archivos_procesados, 1):
+        f.write(f"{i}. `{nombres[archivo]}`\n")
+    f.write("\n")
+    
+    # Tabla de resultados
+    f.write("## 📊 Resultados de Similitud\n\n")
+    
+    # Si hay más de 3 archivos, mostrar matriz de similitud
+    if len(archivos_procesados) > 3:
+        f.write("### Matriz de Similitud (Coseno)\n\n")
+        generar_matriz_similitud(f, resultados, archivos_procesados, 'coseno')
+        f.write("\n")
+    
+    # Tabla detallada de comparaciones
+    f.write("### Comparaciones Detalladas\n\n")
+    f.write("| Archivo A | Archivo B | Coseno | Jaccard | Levenshtein |\n")
+    f.write("|-----------|-----------|--------|---------|-------------|\n")
+    
+    for resultado in resultados:
+        archivo_a = nombres[resultado[0]]
+        archivo_b = nombres[resultado[1]]
+        f.write(f"| `{archivo_a}` | `{archivo_b}` | {resultado[2]:.3f} | {resultado[3]:.3f} | {resultado[4]:.3f} |\n")
+    
+    f.write("\n")
+    
+    # Estadísticas
+    if estadisticas:
+        f.write("## 📈 Estadísticas Resumen\n\n")
         
-        # Estadísticas
-        if estadisticas:
-            f.write("## 📈 Estadísticas Resumen\n\n")
-            
-            # Gráfico de barras en ASCII para estadísticas
-            f.write("### Distribución de Similitud\n\n")
-            f.write("```\n")
-            f.write("Similitud del Coseno\n")
-            f.write(f"Min  {estadisticas['cosine_min']:.3f} {'█' * int(estadisticas['cosine_min'] * 20)}\n")
-            f.write(f"Prom {estadisticas['cosine_promedio']:.3f} {'█' * int(estadisticas['cosine_promedio'] * 20)}\n")
-            f.write(f"Max  {estadisticas['cosine_max']:.3f} {'█' * int(estadisticas['cosine_max'] * 20)}\n")
-            f.write("```\n\n")
-            
-            f.write("### Métricas Detalladas\n\n")
-            f.write("| Métrica | Mínimo | Promedio | Máximo |\n")
-            f.write("|---------|--------|----------|--------|\n")
-            f.write(f"| **Coseno** | {estadisticas['cosine_min']:.3f} | {estadisticas['cosine_promedio']:.3f} | {estadisticas['cosine_max']:.3f} |\n")
-            f.write(f"| **Jaccard** | {estadisticas['jaccard_min']:.3f} | {estadisticas['jaccard_promedio']:.3f} | {estadisticas['jaccard_max']:.3f} |\n")
-            f.write(f"| **Levenshtein** | {estadisticas['levenshtein_min']:.3f} | {estadisticas['levenshtein_promedio']:.3f} | {estadisticas['levenshtein_max']:.3f} |\n")
+        # Gráfico de barras en ASCII para estadísticas
+        f.write("### Distribución de Similitud\n\n")
+        f.write("```\n")
+        f.write("Similitud del Coseno\n")
+        f.write(f"Min  {estadisticas['cosine_min']:.3f} {'█' * int(estadisticas['cosine_min'] * 20)}\n")
+        f.write(f"Prom {estadisticas['cosine_promedio']:.3f} {'█' * int(estadisticas['cosine_promedio'] * 20)}\n")
+        f.write(f"Max  {estadisticas['cosine_max']:.3f} {'█' * int(estadisticas['cosine_max'] * 20)}\n")
+        f.write("```\n\n")
+        
+        f.write("### Métricas Detalladas\n\n")
+        f.write("| Métrica | Mínimo | Promedio | Máximo |\n")
+        f.write("|---------|--------|----------|--------|\n")
+        f.write(f"| **Coseno** | {estadisticas['cosine_min']:.3f} | {estadisticas['cosine_promedio']:.3f} | {estadisticas['cosine_max']:.3f} |\n")
+        f.write(f"| **Jaccard** | {estadisticas['jaccard_min']:.3f} | {estadisticas['jaccard_promedio']:.3f} | {estadisticas['jaccard_max']:.3f} |\n")
+        f.write(f"| **Levenshtein** | {estadisticas['levenshtein_min']:.3f} | {estadisticas['levenshtein_promedio']:.3f} | {estadisticas['levenshtein_max']:.3f} |\n")
+        f.write("\n")
+        
+        # Análisis de similitudes altas
+        similitudes_altas = [(r, m) for r, m in zip(resultados, maximos) if m >= 0.7]
+        if similitudes_altas:
+            f.write("### ⚠️ Similitudes Altas Detectadas\n\n")
+            f.write("Los siguientes pares de archivos muestran similitud alta (≥ 0.7):\n\n")
+            for resultado, max_sim in similitudes_altas:
+                archivo_a = nombres[resultado[0]]
+                archivo_b = nombres[resultado[1]]
+                f.write(f"- `{archivo_a}` ↔ `{archivo_b}`: **{max_sim:.3f}**\n")
             f.write("\n")
-            
-            # Análisis de similitudes altas
-            similitudes_altas = [r for r in resultados if max(r[2], r[3], r[4]) >= 0.7]
-            if similitudes_altas:
-                f.write("### ⚠️ Similitudes Altas Detectadas\n\n")
-                f.write("Los siguientes pares de archivos muestran similitud alta (≥ 0.7):\n\n")
-                for resultado in similitudes_altas:
-                    archivo_a = Path(resultado[0]).name
-                    archivo_b = Path(resultado[1]).name
-                    max_sim = max(resultado[2], resultado[3], resultado[4])
-                    f.write(f"- `{archivo_a}` ↔ `{archivo_b}`: **{max_sim:.3f}**\n")
-                f.write("\n")
-        
-        # Interpretación
-        f.write("## 🎯 Interpretación de Resultados\n\n")
-        f.write("- **0.0 - 0.3:** Similitud baja (códigos muy diferentes)\n")
-        f.write("- **0.3 - 0.7:** Similitud media (algunos elementos comunes)\n")
-        f.write("- **0.7 - 0.9:** Similitud alta (códigos muy parecidos)\n")
-        f.write("- **0.9 - 1.0:** Similitud muy alta (posible duplicación)\n\n")
-        
-        # Metodología
-        f.write("## 🔬 Metodología\n\n")
-        f.write("Este análisis utiliza tres métricas de similitud validadas científicamente:\n\n")
-        f.write("1. **Similitud del Coseno:** Mide el ángulo entre vectores de frecuencia de tokens [1,2]\n")
-        f.write("2. **Índice de Jaccard:** Calcula similitud basada en intersección/unión de conjuntos [3,4]\n")
-        f.write("3. **Ratio de Levenshtein:** Distancia de edición normalizada entre textos [5,6]\n\n")
-        
-        # Referencias académicas
-        f.write("## 📚 Referencias\n\n")
-        f.write("**[1]** Salton, G., Wong, A., & Yang, C. S. (1975). A vector space model for automatic indexing. *Communications of the ACM*, 18(11), 613-620. DOI: 10.1145/361219.361220\n\n")
-        f.write("**[2]** Singhal, A. (2001). Modern information retrieval: A brief overview. *IEEE Data Engineering Bulletin*, 24(4), 35-43.\n\n")
-        f.write("**[3]** Jaccard, P. (1912). The distribution of the flora in the alpine zone. *New Phytologist*, 11(2), 37-50. DOI: 10.1111/j.1469-8137.1912.tb05611.x\n\n")
-        f.write("**[4]** Real, R., & Vargas, J. M. (1996). The probabilistic basis of Jaccard's index of similarity. *Systematic Biology*, 45(3), 380-385. DOI: 10.1093/sysbio/45.3.380\n\n")
-        f.write("**[5]** Levenshtein, V. I. (1966). Binary codes capable of correcting deletions, insertions, and reversals. *Soviet Physics Doklady*, 10(8), 707-710.\n\n")
-        f.write("**[6]** Wagner, R. A., & Fischer, M. J. (1974). The string-to-string correction problem. *Journal of the ACM*, 21(1), 168-173. DOI: 10.1145/321796.321811\n\n")
-        
-        # Referencias adicionales para detección de clones
-        f.write("### Aplicaciones en Detección de Similitud de Código\n\n")
-        f.write("**[7]** Bellon, S., Koschke, R., Antoniol, G., Krinke, J., & Merlo, E. (2007). Comparison and evaluation of clone detection tools. *IEEE Transactions on Software Engineering*, 33(9), 577-591.\n\n")
-        f.write("**[8]** Roy, C. K., Cordy, J. R., & Koschke, R. (2009). Comparison and evaluation of code clone detection techniques and tools: A qualitative approach. *Science of Computer Programming*, 74(7), 470-495.\n\n")
-        
-        # Conclusiones automáticas
-        if estadisticas and len(resultados) > 0:
-            f.write("## 🎯 Conclusiones\n\n")
-            
-            promedio_general = (estadisticas['cosine_promedio'] + 
-                              estadisticas['jaccard_promedio'] + 
-                              estadisticas['levenshtein_promedio']) / 3
-            
-            # Análisis de consistencia entre métricas
-            similitudes_altas_coseno = sum(1 for r in resultados if r[2] >= 0.7)
-            similitudes_altas_jaccard = sum(1 for r in resultados if r[3] >= 0.7)
-            similitudes_altas_levenshtein = sum(1 for r in resultados if r[4] >= 0.7)
-            total_comparaciones = len(resultados)
-            
-            f.write("### Hallazgos Principal\n\n")
-            
-            if promedio_general >= 0.7:
-                f.write("- **Similitud significativa detectada**: Los archivos analizados muestran patrones estructurales y semánticos similares que sugieren origen común o reutilización de código.\n\n")
-            elif promedio_general >= 0.4:
-                f.write("- **Similitud moderada observada**: Existe cierto grado de similitud entre los archivos, posiblemente debido a convenciones de programación compartidas o funcionalidades similares.\n\n")
-            else:
-                f.write("- **Archivos diversos**: Los códigos analizados muestran diferencias sustanciales, indicando implementaciones independientes o enfoques distintos.\n\n")
-            
-            f.write("### Consistencia de Métricas\n\n")
-            if similitudes_altas_coseno > 0 and similitudes_altas_jaccard > 0 and similitudes_altas_levenshtein > 0:
-                f.write("- **Alta consistencia**: Las tres métricas coinciden en identificar similitudes altas, aumentando la confiabilidad del análisis.\n\n")
-            elif (similitudes_altas_coseno > 0) + (similitudes_altas_jaccard > 0) + (similitudes_altas_levenshtein > 0) >= 2:
-                f.write("- **Consistencia moderada**: Al menos dos métricas coinciden en los hallazgos principales.\n\n")
-            else:
-                f.write("- **Métricas divergentes**: Las diferentes métricas capturan aspectos distintos de similitud, sugiriendo patrones de similitud complejos.\n\n")
-            
-            f.write("### Recomendaciones\n\n")
-            if promedio_general >= 0.8:
-                f.write("- **Revisión necesaria**: Se recomienda revisar manualmente los archivos con alta similitud para evaluar posible duplicación o plagio.\n")
-                f.write("- **Refactorización**: Considerar la extracción de código común en módulos reutilizables.\n\n")
-            elif promedio_general >= 0.6:
-                f.write("- **Monitoreo recomendado**: Vigilar la evolución de similitudes en futuras versiones.\n")
-                f.write("- **Documentación**: Documentar las razones de similitudes altas si son intencionales.\n\n")
-            else:
-                f.write("- **Diversidad confirmada**: La variabilidad observada es esperada y saludable en el desarrollo de software.\n\n")
+    
+    # Interpretación
+    f.write("## 🎯 Interpretación de Resultados\n\n")
+    f.write("- **0.0 - 0.3:** Similitud baja (códigos muy diferentes)\n")
+    f.write("- **0.3 - 0.7:** Similitud media (algunos elementos comunes)\n")
+    f.write("- **0.7 - 0.9:** Similitud alta (códigos muy parecidos)\n")
+    f.write("- **0.9 - 1.0:** Similitud muy alta (posible duplicación)\n\n")
+    
+    # Metodología
+    f.write("## 🔬 Metodología\n\n")
+    f.write("Este análisis utiliza tres métricas de similitud validadas científicamente:\n\n")
+    f.write("1. **Similitud del Coseno:** Mide el ángulo entre vectores de frecuencia de tokens [1,2]\n")
+    f.write("2. **Índice de Jaccard:** Calcula similitud basada en intersección/unión de conjuntos [3,4]\n")
+    f.write("3. **Ratio de Levenshtein:** Distancia de edición normalizada entre secuencias de tokens [5,6]\n\n")
+    
+    # Referencias académicas
+    f.write("## 📚 Referencias\n\n")
+    f.write("**[1]** Salton, G., Wong, A., & Yang, C. S. (1975). A vector space model for automatic indexing. *Communications of the ACM*, 18(11), 613-620. DOI: 10.1145/361219.361220\n\n")
+    f.write("**[2]** Singhal, A. (2001). Modern information retrieval: A brief overview. *IEEE Data Engineering Bulletin*, 24(4), 35-43.\n\n")
+    f.write("**[3]** Jaccard, P. (1912). The distribution of the flora in the alpine zone. *New Phytologist*, 11(2), 37-50. DOI: 10.1111/j.1469-8137.1912.tb05611.x\n\n")
+    f.write("**[4]** Real, R., & Vargas, J. M. (1996). The probabilistic basis of Jaccard's index of similarity. *Systematic Biology*, 45(3), 380-385. DOI: 10.1093/sysbio/45.3.380\n\n")
+    f.write("**[5]** Levenshtein, V. I. (1966). Binary codes capable of correcting deletions, insertions, and reversals. *Soviet Physics Doklady*, 10(8), 707-710.\n\n")
+    f.write("**[6]** Wagner, R. A., & Fischer, M. J. (1974). The string-to-string correction problem. *Journal of the ACM*, 21(1), 168-173. DOI: 10.1145/321796.321811\n\n")
+    
+    # Referencias adicionales para detección de clones
+    f.write("### Aplicaciones en Detección de Similitud de Código\n\n")
+    f.write("**[7]** Bellon, S., Koschke, R., Antoniol, G., Krinke, J., & Merlo, E. (2007). Comparison and evaluation of clone detection tools. *IEEE Transactions on Software Engineering*, 33(9), 577-591.\n\n")
+    f.write("**[8]** Roy, C. K., Cordy, J. R., & Koschke, R. (2009). Comparison and evaluation of code clone detection techniques and tools: A qualitative approach. *Science of Computer Programming*, 74(7), 470-495.\n\n")
+    
+    # Conclusiones automáticas
+    if estadisticas and len(resultados) > 0:
+        f.write("## 🎯 Conclusiones\n\n")
+        
+        promedio_general = (estadisticas['cosine_promedio'] + 
+                          estadisticas['jaccard_promedio'] + 
+                          estadisticas['levenshtein_promedio']) / 3
+        
+        # Análisis de consistencia entre métricas: hay algún par con similitud
+        # alta en una métrica si y solo si su máximo llega a 0.7
+        altas_coseno = estadisticas['cosine_max'] >= 0.7
+        altas_jaccard = estadisticas['jaccard_max'] >= 0.7
+        altas_levenshtein = estadisticas['levenshtein_max'] >= 0.7
+        total_comparaciones = len(resultados)
         
-        f.write("---\n")
-        f.write("*Reporte generado por Analizador de Similitud de Códigos Fuente v2.0*\n")
-        f.write("*Basado en algoritmos validados científicamente y mejores prácticas en análisis de código*\n")
+        f.write("### Hallazgos Principal\n\n")
+        
+        if promedio_general >= 0.7:
+            f.write("- **Similitud significativa detectada**: Los archivos analizados muestran patrones estructurales y semánticos similares que sugieren origen común o reutilización de código.\n\n")
+        elif promedio_general >= 0.4:
+            f.write("- **Similitud moderada observada**: Existe cierto grado de similitud entre los archivos, posiblemente debido a convenciones de programación compartidas o funcionalidades similares.\n\n")
+        else:
+            f.write("- **Archivos diversos**: Los códigos analizados muestran diferencias sustanciales, indicando implementaciones independientes o enfoques distintos.\n\n")
+        
+        f.write("### Consistencia de Métricas\n\n")
+        if altas_coseno and altas_jaccard and altas_levenshtein:
+            f.write("- **Alta consistencia**: Las tres métricas coinciden en identificar similitudes altas, aumentando la confiabilidad del análisis.\n\n")
+        elif altas_coseno + altas_jaccard + altas_levenshtein >= 2:
+            f.write("- **Consistencia moderada**: Al menos dos métricas coinciden en los hallazgos principales.\n\n")
+        else:
+            f.write("- **Métricas divergentes**: Las diferentes métricas capturan aspectos distintos de similitud, sugiriendo patrones de similitud complejos.\n\n")
+        
+        f.write("### Recomendaciones\n\n")
+        if promedio_general >= 0.8:
+            f.write("- **Revisión necesaria**: Se recomienda revisar manualmente los archivos con alta similitud para evaluar posible duplicación o plagio.\n")
+            f.write("- **Refactorización**: Considerar la extracción de código común en módulos reutilizables.\n\n")
+        elif promedio_general >= 0.6:
+            f.write("- **Monitoreo recomendado**: Vigilar la evolución de similitudes en futuras versiones.\n")
+            f.write("- **Documentación**: Documentar las razones de similitudes altas si son intencionales.\n\n")
+        else:
+            f.write("- **Diversidad confirmada**: La variabilidad observada es esperada y saludable en el desarrollo de software.\n\n")
+    
+    f.write("---\n")
+    f.write("*Reporte generado por Analizador de Similitud de Códigos Fuente v2.0*\n")
+    f.write("*Basado en algoritmos validados científicamente y mejores prácticas en análisis de código*\n")
+    
+    return f.getvalue()
+
+
+@lru_cache(maxsize=None)
+def _programa_disponible(programa: str) -> bool:
+    """Indica si un ejecutable está en el PATH (se consulta una vez por proceso)."""
+    return shutil.which(programa) is not None
 
 
 def generar_reporte_pdf(resultados: List[List], estadisticas: Dict, 
-                       archivo_salida: str, archivos_procesados: List[str]) -> bool:
+                       archivo_salida: str, archivos_procesados: List[str],
+                       contenido: Optional[str] = None,
+                       fecha: Optional[datetime] = None) -> bool:
     """
     Genera un reporte en formato PDF. Requiere que pandoc esté instalado.
     
@@ -618,31 +1130,42 @@ def generar_reporte_pdf(resultados: List[List], estadisticas: Dict,
         estadisticas: Diccionario con estadísticas resumen
         archivo_salida: Nombre base del archivo de salida
         archivos_procesados: Lista de archivos que fueron procesados
+        contenido: Reporte Markdown ya generado con renderizar_markdown()
+        fecha: Fecha de generación del reporte (por defecto, la actual)
     
     Returns:
         bool: True si se generó exitosamente, False en caso contrario
     """
     try:
-        # Primero generar el Markdown
-        generar_reporte_markdown(resultados, estadisticas, archivo_salida + "_temp", archivos_procesados)
-        
         # Verificar si pandoc está disponible
-        try:
-            subprocess.run(['pandoc', '--version'], capture_output=True, check=True)
-        except (subprocess.CalledProcessError, FileNotFoundError):
+        if not _programa_disponible('pandoc'):
             print("⚠️  pandoc no está instalado. Para generar PDF, instale pandoc:")
             print("    Ubuntu/Debian: sudo apt-get install pandoc")
             print("    macOS: brew install pandoc")
             print("    Windows: https://pandoc.org/installing.html")
             return False
         
-        # Intentar diferentes motores PDF
-        motores_pdf = ['xelatex', 'pdflatex', 'lualatex']
+        # Intentar solo los motores PDF instalados
+        motores_pdf = [motor for motor in ('xelatex', 'pdflatex', 'lualatex')
+                       if _programa_disponible(motor)]
+        if not motores_pdf:
+            print("❌ No se encontró ningún motor LaTeX (xelatex, pdflatex, lualatex)")
+            print("💡 Sugerencia: Instale un motor LaTeX:")
+            print("    Ubuntu/Debian: sudo apt-get install texlive-xetex")
+            print("    macOS: brew install mactex")
+            return False
+        
+        # El Markdown se pasa a pandoc por stdin, sin archivo temporal
+        fecha = fecha or datetime.now()
+        if contenido is None:
+            contenido = renderizar_markdown(resultados, estadisticas, archivos_procesados, fecha)
+        entrada_md = contenido.encode('utf-8')
+        fecha_pdf = fecha.strftime("%Y-%m-%d")
         
         for motor in motores_pdf:
             comando_pandoc = [
                 'pandoc',
-                f'{archivo_salida}_temp.md',
+                '-f', 'markdown',
                 '-o', f'{archivo_salida}.pdf',
                 f'--pdf-engine={motor}',
                 '-V', 'geometry:margin=1in',
@@ -650,7 +1173,7 @@ def generar_reporte_pdf(resultados: List[List], estadisticas: Dict,
                 '-V', 'linestretch=1.2',
                 '--metadata', 'title=Reporte de Similitud de Códigos Fuente',
                 '--metadata', 'author=Analizador de Similitud v2.0',
-                '--metadata', f'date={datetime.now().strftime("%Y-%m-%d")}',
+                '--metadata', f'date={fecha_pdf}',
                 '--metadata', 'subject=Análisis de Similitud de Código Fuente',
                 '--metadata', 'keywords=similitud,código,coseno,jaccard,levenshtein',
                 '--table-of-contents',
@@ -658,16 +1181,15 @@ def generar_reporte_pdf(resultados: List[List], estadisticas: Dict,
             ]
             
             try:
-                resultado = subprocess.run(comando_pandoc, capture_output=True, text=True, timeout=30)
+                resultado = subprocess.run(comando_pandoc, input=entrada_md,
+                                           capture_output=True, timeout=30)
                 
                 if resultado.returncode == 0:
-                    # Limpiar archivo temporal
-                    if os.path.exists(f'{archivo_salida}_temp.md'):
-                        os.remove(f'{archivo_salida}_temp.md')
                     return True
                 else:
                     if motor == motores_pdf[-1]:  # último intento
-                        print(f"❌ Error con {motor}: {resultado.stderr}")
+                        error = resultado.stderr.decode('utf-8', errors='replace')
+                        print(f"❌ Error con {motor}: {error}")
                         print("💡 Sugerencia: Instale un motor LaTeX:")
                         print("    Ubuntu/Debian: sudo apt-get install texlive-xetex")
                         print("    macOS: brew install mactex")
@@ -702,9 +1224,14 @@ def guardar_resultados(resultados: List[List], estadisticas: Dict, formato: str
     if archivos_procesados is None:
         archivos_procesados = []
     
+    # Una sola marca de tiempo para todo el reporte
+    fecha = datetime.now()
+    
     try:
         if formato.lower() == 'csv':
-            with open(f'{archivo_salida}.csv', 'w', newline='', encoding='utf-8') as f:
+            # Búfer de 1 MiB: menos escrituras al sistema con muchas comparaciones
+            with open(f'{archivo_salida}.csv', 'w', newline='', encoding='utf-8',
+                      buffering=1 << 20) as f:
                 writer = csv.writer(f)
                 writer.writerow(["Archivo A", "Archivo B", "Cosine", "Jaccard", "Levenshtein"])
                 writer.writerows(resultados)
@@ -712,15 +1239,15 @@ def guardar_resultados(resultados: List[List], estadisticas: Dict, formato: str
                 # Agregar estadísticas al final
                 writer.writerow([])
                 writer.writerow(["=== ESTADÍSTICAS ==="])
-                for key, value in estadisticas.items():
-                    writer.writerow([key.replace('_', ' ').title(), f"{value:.4f}"])
+                writer.writerows([key.replace('_', ' ').title(), f"{value:.4f}"]
+                                 for key, value in estadisticas.items())
             
             print(f"✅ Reporte CSV generado: {archivo_salida}.csv")
         
         elif formato.lower() == 'json':
             datos = {
                 'metadata': {
-                    'fecha_generacion': datetime.now().isoformat(),
+                    'fecha_generacion': fecha.isoformat(),
                     'version': '2.0',
                     'archivos_procesados': len(archivos_procesados)
                 },
@@ -737,30 +1264,172 @@ def guardar_resultados(resultados: List[List], estadisticas: Dict, formato: str
                 'estadisticas': estadisticas
             }
             
-            with open(f'{archivo_salida}.json', 'w', encoding='utf-8') as f:
-                json.dump(datos, f, indent=2, ensure_ascii=False)
+            if orjson is not None:
+                with open(f'{archivo_salida}.json', 'wb') as f:
+                    f.write(orjson.dumps(datos, option=orjson.OPT_INDENT_2))
+            else:
+                with open(f'{archivo_salida}.json', 'w', encoding='utf-8') as f:
+                    json.dump(datos, f, indent=2, ensure_ascii=False)
             
             print(f"✅ Reporte JSON generado: {archivo_salida}.json")
         
         elif formato.lower() == 'md':
-            generar_reporte_markdown(resultados, estadisticas, archivo_salida, archivos_procesados)
+            generar_reporte_markdown(resultados, estadisticas, archivo_salida,
+                                     archivos_procesados, fecha=fecha)
             print(f"✅ Reporte Markdown generado: {archivo_salida}.md")
         
         elif formato.lower() == 'pdf':
-            if generar_reporte_pdf(resultados, estadisticas, archivo_salida, archivos_procesados):
+            # El mismo Markdown sirve para pandoc y, si falla, como alternativa
+            contenido = renderizar_markdown(resultados, estadisticas, archivos_procesados, fecha)
+            if generar_reporte_pdf(resultados, estadisticas, archivo_salida, archivos_procesados,
+                                   contenido, fecha):
                 print(f"✅ Reporte PDF generado: {archivo_salida}.pdf")
             else:
                 # Fallback a Markdown si PDF falla
-                generar_reporte_markdown(resultados, estadisticas, archivo_salida, archivos_procesados)
+                generar_reporte_markdown(resultados, estadisticas, archivo_salida,
+                                         archivos_procesados, contenido)
                 print(f"✅ Reporte Markdown generado como alternativa: {archivo_salida}.md")
         
     except IOError as e:
         print(f"❌ Error guardando reporte: {e}")
 
 
+# Coste aproximado de ratio_levenshtein en segundos: (fijo por par, por
+# elemento de la secuencia más corta, por celda de la matriz de programación
+# dinámica), medido con rapidfuzz y con el algoritmo bit-paralelo propio
+_COSTE_LEVENSHTEIN_RAPIDFUZZ = (3e-6, 0.0, 1e-10)
+_COSTE_LEVENSHTEIN_PYTHON = (0.0, 1e-6, 5e-10)
+
+# Trabajo secuencial estimado a partir del cual compensa lanzar procesos
+# trabajadores: con 'spawn' (macOS, Windows) arrancarlos cuesta varias décimas
+_MIN_SEGUNDOS_PARALELO = 0.5
+
+# En Windows ProcessPoolExecutor no admite más de 61 procesos
+_MAX_PROCESOS_WINDOWS = 61
+
+# Identificadores de tokens de cada archivo disponibles en los procesos trabajadores
+_DATOS_TRABAJADOR = {}
+
+
+def _estimar_segundos_levenshtein(tareas: Sequence[Tuple[str, str, float]],
+                                  tokens: Dict[str, Sequence[int]]) -> float:
+    """Estima cuánto tardarían en un solo proceso las tareas de Levenshtein."""
+    por_par, por_elemento, por_celda = (_COSTE_LEVENSHTEIN_RAPIDFUZZ if _Lev is not None
+                                        else _COSTE_LEVENSHTEIN_PYTHON)
+    total = 0.0
+    for a, b, _ in tareas:
+        la, lb = len(tokens[a]), len(tokens[b])
+        total += por_par + por_elemento * min(la, lb) + por_celda * la * lb
+    return total
+
+
+def _inicializar_trabajador(datos: Dict[str, Sequence[int]]) -> None:
+    """Recibe una sola vez por proceso los tokens de todos los archivos."""
+    global _DATOS_TRABAJADOR
+    _DATOS_TRABAJADOR = datos
+
+
+def _comparar_par(tarea: Tuple[str, str, float]) -> float:
+    """Calcula Levenshtein para un par de archivos dentro de un proceso trabajador."""
+    a, b, min_ratio = tarea
+    return ratio_levenshtein(_DATOS_TRABAJADOR[a], _DATOS_TRABAJADOR[b], min_ratio)
+
+
+def calcular_comparaciones(pares: List[Tuple[str, str]], datos: Dict[str, Tuple],
+                           procesos: Optional[int] = None,
+                           umbral: float = 0.0) -> List[Tuple[float, float, float]]:
+    """
+    Calcula las métricas de todos los pares, en paralelo si compensa.
+    
+    Coseno y Jaccard se obtienen para todos los pares a la vez con
+    similitudes_por_lotes(). Levenshtein, la métrica más costosa, se reparte
+    entre procesos (el GIL impide escalar con hilos); los tokens de cada
+    archivo se envían una sola vez a cada proceso mediante el inicializador,
+    no con cada tarea. Si coseno y Jaccard quedan bajo el umbral, el par solo
+    se conserva cuando Levenshtein lo supera, así que se le pasa el umbral
+    para que pueda abandonar el cálculo en cuanto sea imposible alcanzarlo, y
+    ni siquiera se calcula si la cota de similitudes_por_lotes() ya lo descarta.
+    Los archivos con tokens idénticos se agrupan: entre ellos la similitud es
+    1.0 y frente al resto se calcula una sola vez por grupo.
+    
+    Args:
+        pares: Pares de archivos (a, b) a comparar
+        datos: Diccionario archivo -> (estructuras de preparar_tokens,
+               identificadores de tokens)
+        procesos: Número de procesos (None: núcleos disponibles, 1: secuencial)
+        umbral: Umbral de similitud; los pares que quedan por debajo en las
+                tres métricas pueden devolver Levenshtein 0.0 sin calcularlo
+    
+    Returns:
+        Lista de tuplas (coseno, jaccard, levenshtein) en el orden de 'pares'
+    """
+    # Archivos con los mismos tokens (copias exactas o que solo difieren en
+    # comentarios y espacios) se comparan una sola vez como grupo
+    grupo_por_tokens = {}
+    grupos = {}
+    representantes = []
+    for nombre, (_, identificadores) in datos.items():
+        clave = tuple(identificadores)
+        if clave not in grupo_por_tokens:
+            grupo_por_tokens[clave] = len(representantes)
+            representantes.append(nombre)
+        grupos[nombre] = grupo_por_tokens[clave]
+    
+    coseno, jaccard, cota_levenshtein = similitudes_por_lotes(
+        [datos[nombre][0] for nombre in representantes])
+    
+    similitudes = []
+    tareas = {}
+    for a, b in pares:
+        i, j = sorted((grupos[a], grupos[b]))
+        if i == j:
+            similitudes.append((1.0, 1.0, 1.0, None))
+            continue
+        
+        cos, jac = coseno[i][j], jaccard[i][j]
+        if cos >= umbral or jac >= umbral:
+            min_ratio = 0.0
+        elif cota_levenshtein[i][j] < umbral:
+            # Levenshtein tampoco puede alcanzar el umbral: el par se descarta
+            similitudes.append((cos, jac, 0.0, None))
+            continue
+        else:
+            min_ratio = umbral
+        similitudes.append((cos, jac, None, (i, j)))
+        tareas.setdefault((i, j), (representantes[i], representantes[j], min_ratio))
+    
+    tokens = {nombre: datos[nombre][1] for nombre in representantes}
+    tareas_lista = list(tareas.values())
+    procesos = procesos or os.cpu_count() or 1
+    if sys.platform == 'win32':
+        procesos = min(procesos, _MAX_PROCESOS_WINDOWS)
+    levenshtein = None
+    
+    if (procesos > 1 and tareas_lista
+            and _estimar_segundos_levenshtein(tareas_lista, tokens) >= _MIN_SEGUNDOS_PARALELO):
+        try:
+            with ProcessPoolExecutor(max_workers=procesos,
+                                     initializer=_inicializar_trabajador,
+                                     initargs=(tokens,)) as ejecutor:
+                tamano_lote = max(1, len(tareas_lista) // (procesos * 4))
+                levenshtein = list(ejecutor.map(_comparar_par, tareas_lista, chunksize=tamano_lote))
+        except (OSError, NotImplementedError, ValueError) as e:
+            print(f"⚠️  No se pudo usar procesamiento paralelo ({e}), comparando secuencialmente")
+    
+    if levenshtein is None:
+        levenshtein = [ratio_levenshtein(tokens[a], tokens[b], min_ratio)
+                       for a, b, min_ratio in tareas_lista]
+    
+    por_grupos = dict(zip(tareas, levenshtein))
+    return [(cos, jac, por_grupos[grupo] if grupo is not None else lev)
+            for cos, jac, lev, grupo in similitudes]
+
+
 def comparar_archivos(archivos: List[str], threshold: float = 0.0, 
                      formato_salida: str = 'csv', archivo_salida: str = 'reporte_similitud',
-                     mostrar_estadisticas: bool = True) -> Optional[List[List]]:
+                     mostrar_estadisticas: bool = True,
+                     procesos: Optional[int] = None,
+                     usar_cache: bool = True) -> Optional[List[List]]:
     """
     Compara múltiples archivos de código y genera reporte de similitud.
     
@@ -770,6 +1439,8 @@ def comparar_archivos(archivos: List[str], threshold: float = 0.0,
         formato_salida: Formato del reporte ('csv', 'json')
         archivo_salida: Nombre base del archivo de salida
         mostrar_estadisticas: Si mostrar estadísticas en consola
+        procesos: Procesos para las comparaciones (None: núcleos disponibles)
+        usar_cache: Reutilizar los tokens guardados en disco de ejecuciones previas
     
     Returns:
         Lista de resultados o None si hay error
@@ -780,27 +1451,32 @@ def comparar_archivos(archivos: List[str], threshold: float = 0.0,
     codigos = {}
     archivos_validos = []
     
-    for nombre in archivos:
-        es_valido, mensaje = validar_archivo(nombre)
+    validaciones = [(nombre, validar_archivo(nombre)) for nombre in archivos]
+    contenidos = leer_archivos([nombre for nombre, (es_valido, _) in validaciones if es_valido])
+    
+    for nombre, (es_valido, mensaje) in validaciones:
         if not es_valido:
             print(f"⚠️  {mensaje}")
             continue
         
         try:
-            with open(nombre, 'r', encoding='utf-8') as f:
-                contenido = f.read()
-                lenguaje = detectar_lenguaje(nombre)
-                tokens = limpiar_codigo(contenido, lenguaje)
-                
-                if not tokens:
-                    print(f"⚠️  No se pudieron extraer tokens de {nombre}")
-                    continue
-                
-                codigos[nombre] = tokens
-                codigos[nombre + "_txt"] = ' '.join(tokens)
-                archivos_validos.append(nombre)
-                print(f"✅ Procesado: {nombre} ({len(tokens)} tokens, lenguaje: {lenguaje})")
+            contenido = contenidos[nombre]
+            if isinstance(contenido, OSError):
+                raise contenido
+            lenguaje = detectar_lenguaje(nombre)
+            tokens = tokenizar_archivo(nombre, lenguaje, usar_cache, contenido)
+            
+            if not tokens:
+                print(f"⚠️  No se pudieron extraer tokens de {nombre}")
+                continue
+            
+            codigos[nombre] = tokens
+            archivos_validos.append(nombre)
+            print(f"✅ Procesado: {nombre} ({len(tokens)} tokens, lenguaje: {lenguaje})")
         
+        except (IOError, UnicodeDecodeError) as e:
+            print(f"⚠️  Error leyendo {nombre}: {e}")
+            continue
         except Exception as e:
             print(f"❌ Error procesando {nombre}: {e}")
             continue
@@ -811,24 +1487,29 @@ def comparar_archivos(archivos: List[str], threshold: float = 0.0,
     
     print(f"\n📊 Comparando {len(archivos_validos)} archivos...\n")
     
+    # Estructuras por archivo que necesitan las comparaciones
+    datos = {}
+    vocabulario = {}
+    for nombre in archivos_validos:
+        identificadores = codificar_tokens(codigos[nombre], vocabulario)
+        datos[nombre] = (preparar_tokens(identificadores), identificadores)
+    
     # Realizar comparaciones
     resultados = []
     print(f"{'Comparación':60} | {'Cosine':>7} | {'Jaccard':>8} | {'Leven.':>8} |")
     print("-" * 95)
     
-    for a, b in combinations(archivos_validos, 2):
-        cos = similitud_coseno(codigos[a], codigos[b])
-        jac = similitud_jaccard(codigos[a], codigos[b])
-        lev = ratio_levenshtein(codigos[a + '_txt'], codigos[b + '_txt'])
-        
-        # Aplicar threshold
-        if max(cos, jac, lev) >= threshold:
+    pares = list(combinations(archivos_validos, 2))
+    metricas = calcular_comparaciones(pares, datos, procesos, threshold)
+    nombres = {archivo: Path(archivo).name for archivo in archivos_validos}
+    
+    for (a, b), (cos, jac, lev) in zip(pares, metricas):
+        # Aplicar threshold (comparaciones encadenadas: evita llamar a max() por par)
+        if cos >= threshold or jac >= threshold or lev >= threshold:
             resultados.append([a, b, round(cos, 4), round(jac, 4), round(lev, 4)])
             
             # Formatear nombres para display
-            nombre_a = Path(a).name
-            nombre_b = Path(b).name
-            comparacion = f"{nombre_a} ↔ {nombre_b}"
+            comparacion = f"{nombres[a]} ↔ {nombres[b]}"
             
             print(f"{comparacion:60} | {cos:7.3f} | {jac:8.3f} | {lev:8.3f} |")
     
@@ -856,8 +1537,9 @@ def comparar_archivos(archivos: List[str], threshold: float = 0.0,
 # 🔹 Configuración de argumentos y main
 # ======================================
 
+@lru_cache(maxsize=None)
 def configurar_argumentos() -> argparse.ArgumentParser:
-    """Configura los argumentos de línea de comandos."""
+    """Configura los argumentos de línea de comandos (el parser se crea una vez por proceso)."""
     parser = argparse.ArgumentParser(
         description='🔍 Analizador de similitud entre códigos fuente',
         formatter_class=argparse.RawDescriptionHelpFormatter,
@@ -886,6 +1568,12 @@ Ejemplos de uso:
     parser.add_argument('--no-estadisticas', action='store_true',
                        help='No mostrar estadísticas en consola')
     
+    parser.add_argument('-j', '--procesos', type=int, default=None,
+                       help='Procesos para las comparaciones (default: núcleos disponibles)')
+    
+    parser.add_argument('--sin-cache', action='store_true',
+                       help='No leer ni escribir la caché de tokens en disco')
+    
     parser.add_argument('--version', action='version', version='%(prog)s 2.0')
     
     return parser
@@ -905,6 +1593,10 @@ def main():
         print("❌ Error: El threshold debe estar entre 0.0 y 1.0")
         sys.exit(1)
     
+    if args.procesos is not None and args.procesos < 1:
+        print("❌ Error: El número de procesos debe ser al menos 1")
+        sys.exit(1)
+    
     print("=" * 80)
     print("🔍 ANALIZADOR DE SIMILITUD DE CÓDIGOS FUENTE v2.0")
     print("=" * 80)
@@ -916,7 +1608,9 @@ def main():
             threshold=args.threshold,
             formato_salida=args.formato,
             archivo_salida=args.output,
-            mostrar_estadisticas=not args.no_estadisticas
+            mostrar_estadisticas=not args.no_estadisticas,
+            procesos=args.procesos,
+            usar_cache=not args.sin_cache
         )
         
         if resultados is None:
@@ -7,6 +7,8 @@ def calcular_perimetro_rectangulo(largo, ancho):
     return 2 * (largo + ancho)
 
 class Rectangulo:
+    __slots__ = ('largo', 'ancho')
+    
     def __init__(self, largo, ancho):
         self.largo = largo
         self.ancho = ancho
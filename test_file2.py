@@ -9,6 +9,8 @@ def perimetro_rectangulo(longitud, anchura):
     return resultado
 
 class FiguraRectangular:
+    __slots__ = ('longitud', 'anchura')
+    
     def __init__(self, longitud, anchura):
         self.longitud = longitud
         self.anchura = anchura
@@ -1,12 +1,15 @@
 import math
 
+_PI = math.pi
+_DOS_PI = 2 * math.pi
+
 def calcular_area_circulo(radio):
     """Calcula el área de un círculo."""
-    return math.pi * radio ** 2
+    return _PI * (radio * radio)
 
 def calcular_circunferencia(radio):
     """Calcula la circunferencia de un círculo."""
-    return 2 * math.pi * radio
+    return _DOS_PI * radio
 
 class Circulo:
     def __init__(self, radio):
@@ -1,3 +1,5 @@
+import math
+
 def calcular_potencia(base, exponente):
     """Calcula la potencia de un número."""
     return base ** exponente
@@ -6,7 +8,17 @@ def calcular_factorial(n):
     """Calcula el factorial de un número."""
     if n <= 1:
         return 1
-    return n * calcular_factorial(n - 1)
+    if isinstance(n, int):
+        return math.factorial(n)
+    # Otros números (p. ej. 5.0) conservan el producto n * (n - 1) * ... original
+    factores = []
+    while n > 1:
+        factores.append(n)
+        n -= 1
+    resultado = 1
+    for factor in reversed(factores):
+        resultado = factor * resultado
+    return resultado
 
 class Calculadora:
     def __init__(self):
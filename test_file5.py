@@ -2,7 +2,7 @@ import random
 
 def generar_numeros_aleatorios(cantidad):
     """Genera una lista de números aleatorios."""
-    return [random.randint(1, 100) for _ in range(cantidad)]
+    return random.choices(range(1, 101), k=cantidad)
 
 def ordenar_lista(lista):
     """Ordena una lista de números."""
@@ -11,14 +11,18 @@ def ordenar_lista(lista):
 class GestorNumeros:
     def __init__(self):
         self.numeros = []
+        self._ordenados = None  # se recalcula solo tras agregar números
     
     def agregar_aleatorios(self, cantidad):
         nuevos = generar_numeros_aleatorios(cantidad)
         self.numeros.extend(nuevos)
+        self._ordenados = None
         return nuevos
     
     def obtener_ordenados(self):
-        return ordenar_lista(self.numeros)
+        if self._ordenados is None:
+            self._ordenados = ordenar_lista(self.numeros)
+        return list(self._ordenados)
 
 def main():
     gestor = GestorNumeros()